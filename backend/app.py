@@ -1,32 +1,189 @@
+import hashlib
+import logging
 import math
 import os
-from collections import Counter
-from datetime import datetime
+import re
+import threading
+import time
+from datetime import date
+from decimal import Decimal
 from typing import List, Tuple, Dict, Any
 import numpy as np
-from sklearn.neighbors import NearestNeighbors
+import orjson
+from cachetools import LRUCache, TLRUCache
+
+try:
+    from numba import njit
+except ImportError:  # optional JIT; _knn_topk falls back to NumPy
+    njit = None
 
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
     get_jwt_identity,
     jwt_required,
 )
-from werkzeug.security import check_password_hash, generate_password_hash
+from db import get_connection, init_db, release_connection, DB_PATH
+from passwords import hash_password, needs_rehash, verify_password
+
+
+class ORJSONProvider(JSONProvider):
+    """Route jsonify()/request.get_json() through orjson instead of the stdlib json module."""
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    @staticmethod
+    def _default(obj):
+        # orjson handles datetime natively; keep plain dates and Decimals serializable too
+        if isinstance(obj, date):
+            return obj.isoformat()
+        if isinstance(obj, Decimal):
+            return float(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumpb(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self._default, option=self.option)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
-from db import get_connection, init_db, DB_PATH
+class CachingJWTManager(JWTManager):
+    """JWTManager that memoizes successful token verification.
+
+    Clients reuse one access token for many requests, so the HS256 check and
+    payload decode are skipped once a token is known good. Entries expire at
+    the token's `exp` (capped at JWT_VERIFY_CACHE_TTL) and failed validations
+    are never cached.
+    """
+
+    JWT_VERIFY_CACHE_TTL = 300
+    JWT_VERIFY_CACHE_SIZE = 4096
+
+    def __init__(self, app=None, add_context_processor=False):
+        self._verified = TLRUCache(
+            maxsize=self.JWT_VERIFY_CACHE_SIZE, ttu=self._expires_at, timer=time.time
+        )
+        self._verified_lock = threading.Lock()
+        super().__init__(app, add_context_processor)
+
+    @classmethod
+    def _expires_at(cls, key, payload, now):
+        return min(payload.get("exp", now), now + cls.JWT_VERIFY_CACHE_TTL)
+
+    # Overrides a private JWTManager method; its name and signature are those of
+    # flask-jwt-extended 4.7, which requirements.txt pins (>=4.7,<4.8).
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.blake2b(encoded_token.encode(), digest_size=16).digest()
+        with self._verified_lock:
+            payload = self._verified.get(key)
+        if payload is not None:
+            return payload
+
+        payload = super()._decode_jwt_from_config(encoded_token)
+        with self._verified_lock:
+            self._verified[key] = payload
+        return payload
+
+
+DATE_RE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+
+
+def _parse_date(value: str) -> date:
+    # Strict YYYY-MM-DD; cheaper than datetime.fromisoformat(...).date()
+    m = DATE_RE.fullmatch(value)
+    if not m:
+        raise ValueError(f"Invalid date: {value!r}")
+    return date(int(m[1]), int(m[2]), int(m[3]))
+
+
+# Fixed text for the cold-start (fewer than 3 trips) recommendations
+POPULAR_REASON = "Popular destination - add more trips for AI-powered recommendations"
+POPULAR_MESSAGE = "Add more trips to get AI-powered recommendations."
+
+# Serialized GET /trips, /trips/stats, /trips/spending bodies keyed by (user_id, view),
+# each stored as (trips_version, etag, payload)
+CACHED_VIEWS = ("trips", "stats", "spending")
+RESP_CACHE = LRUCache(maxsize=3 * 1024)
+RESP_CACHE_LOCK = threading.Lock()
+TRIPS_VERSION_SQL = "SELECT trips_version FROM users WHERE id = ?"
+BUMP_TRIPS_VERSION_SQL = "UPDATE users SET trips_version = trips_version + 1 WHERE id = ?"
+
+# Throttles /auth/login and /auth/register per client IP
+AUTH_RATE_LIMIT = os.environ.get("AUTH_RATE_LIMIT", "5/minute")
+
+# Compared against when the username doesn't exist, to equalize login timing
+_DUMMY_HASH = hash_password("triplogger-timing-dummy")
+
+# Recently registered / attempted-duplicate usernames (users are never deleted)
+_taken_usernames = LRUCache(maxsize=4096)
+_taken_usernames_lock = threading.Lock()
+
+# Column order of the trip SELECTs in list_trips / trip_detail
+TRIP_FIELDS = ("id", "destination", "start_date", "end_date", "budget", "rating")
+
+INSERT_TRIP_SQL = """
+    INSERT INTO trips (destination, start_date, end_date, budget, rating, user_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_TRIP_SQL = """
+    SELECT id, destination, start_date, end_date, budget, rating
+    FROM trips WHERE id = ? AND user_id = ?
+"""
+# Ownership is part of the WHERE clause; rowcount == 0 means "not found or not yours"
+UPDATE_TRIP_SQL = """
+    UPDATE trips
+    SET destination = ?, start_date = ?, end_date = ?, budget = ?, rating = ?
+    WHERE id = ? AND user_id = ?
+"""
+DELETE_TRIP_SQL = "DELETE FROM trips WHERE id = ? AND user_id = ?"
+
+# Pre-serialized bodies for the fixed error responses on hot validation paths.
+# A fresh Response is still built per request (CORS and other hooks mutate headers).
+ERRORS = {
+    key: (orjson.dumps({"error": message}), status)
+    for key, (message, status) in {
+        "token_expired": ("Token has expired. Please login again.", 401),
+        "token_invalid": ("Invalid token. Please login again.", 401),
+        "token_missing": ("Authorization required. Please login.", 401),
+        "missing_auth": ("Username and password are required.", 400),
+        "short_password": ("Password must be at least 6 characters.", 400),
+        "username_exists": ("Username already exists.", 400),
+        "invalid_credentials": ("Invalid credentials.", 401),
+        "invalid_destination": ("Destination must be a non-empty string.", 400),
+        "invalid_date": ("Invalid date format. Use ISO format YYYY-MM-DD.", 400),
+        "end_before_start": ("End date cannot be before start date.", 400),
+        "not_numbers": ("Budget and rating must be numbers.", 400),
+        "negative_budget": ("Budget must be non-negative.", 400),
+        "rating_range": ("Rating must be between 0 and 5.", 400),
+        "trip_not_found": ("Trip not found", 404),
+        "rate_limited": ("Too many attempts. Please try again later.", 429),
+    }.items()
+}
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     secret_key = os.environ.get("JWT_SECRET_KEY", "triplogger-dev-secret-key-2025")
     app.config["JWT_SECRET_KEY"] = secret_key
     app.config["JWT_ALGORITHM"] = "HS256"
     
     # CORS configuration - permissive for development
     is_dev = os.environ.get("FLASK_ENV") != "production"
+    # %-style logger args are only formatted when a record is actually emitted
+    app.logger.setLevel(logging.DEBUG if is_dev else logging.INFO)
     if is_dev:
         # Allow all origins in development
         CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization"]}}, supports_credentials=True)
@@ -34,25 +191,78 @@ def create_app():
         # Production: restrict to specific origins
         CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"], supports_credentials=True)
     
-    jwt = JWTManager(app)
-    print(f"🔐 JWT initialized with secret key: {secret_key[:20]}...")
+    jwt = CachingJWTManager(app)
+    # Per-client-IP limits on the password-hashing routes. In-memory storage is per
+    # worker process; point RATELIMIT_STORAGE_URI at e.g. redis:// for a shared limit.
+    limiter = Limiter(
+        get_remote_address,
+        app=app,
+        storage_uri=os.environ.get("RATELIMIT_STORAGE_URI", "memory://"),
+    )
+    app.logger.debug("🔐 JWT initialized (%s)", app.config["JWT_ALGORITHM"])
     init_db()
+    _destination_table()
+
+    def error_response(key):
+        body, status = ERRORS[key]
+        return app.response_class(body, status=status, mimetype="application/json")
+
+    def cached_json(user_id, name, build):
+        """Serve build(conn)'s JSON from RESP_CACHE while the user's trips_version is unchanged.
+
+        The version is read before building, so a concurrent write can only make
+        the cached payload newer than its version, never older.
+        """
+        conn = get_connection()
+        row = conn.execute(TRIPS_VERSION_SQL, (user_id,)).fetchone()
+        version = row["trips_version"] if row else 0
+        with RESP_CACHE_LOCK:
+            entry = RESP_CACHE.get((user_id, name))
+        if entry is None or entry[0] != version:
+            payload = app.json.dumpb(build(conn))
+            entry = (version, hashlib.blake2b(payload, digest_size=8).hexdigest(), payload)
+            with RESP_CACHE_LOCK:
+                RESP_CACHE[(user_id, name)] = entry
+        _, etag, payload = entry
+
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(payload, mimetype="application/json")
+        response.set_etag(etag)
+        return response
+
+    def trips_changed(conn, user_id):
+        # Call inside the write transaction, before commit
+        conn.execute(BUMP_TRIPS_VERSION_SQL, (user_id,))
+        with RESP_CACHE_LOCK:
+            for name in CACHED_VIEWS:
+                RESP_CACHE.pop((user_id, name), None)
+
+    # Connections are per-thread and long-lived; only reset leftover transactions here
+    @app.teardown_appcontext
+    def teardown_db(exception):
+        release_connection()
 
     # JWT error handlers with detailed logging
+    @app.errorhandler(429)
+    def rate_limited(error):
+        return error_response("rate_limited")
+
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
-        print(f"⏰ Token expired")
-        return jsonify({"error": "Token has expired. Please login again."}), 401
+        app.logger.debug("⏰ Token expired")
+        return error_response("token_expired")
 
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
-        print(f"❌ Invalid token error: {error}")
-        return jsonify({"error": "Invalid token. Please login again."}), 401
+        app.logger.debug("❌ Invalid token error: %s", error)
+        return error_response("token_invalid")
 
     @jwt.unauthorized_loader
     def missing_token_callback(error):
-        print(f"🚫 Missing/unauthorized token: {error}")
-        return jsonify({"error": "Authorization required. Please login."}), 401
+        app.logger.debug("🚫 Missing/unauthorized token: %s", error)
+        return error_response("token_missing")
     
     @app.route("/health", methods=["GET"])
     def health():
@@ -61,7 +271,6 @@ def create_app():
             # Check database connectivity
             total_users = conn.execute("SELECT COUNT(*) as count FROM users").fetchone()["count"]
             total_trips = conn.execute("SELECT COUNT(*) as count FROM trips").fetchone()["count"]
-            conn.close()
             
             return jsonify({
                 "status": "ok",
@@ -96,8 +305,6 @@ def create_app():
             # Get all users (for debugging)
             all_users = conn.execute("SELECT id, username FROM users").fetchall()
             
-            conn.close()
-            
             return jsonify({
                 "current_user": dict(user_row) if user_row else None,
                 "trips_count": trips_count,
@@ -112,124 +319,180 @@ def create_app():
 
     # register route
     @app.route("/auth/register", methods=["POST"])
+    @limiter.limit(AUTH_RATE_LIMIT)
     def register():
         data = request.get_json(force=True)
         username = (data.get("username") or "").strip().lower()
         password = data.get("password")
         if not username or not password:
-            return jsonify({"error": "Username and password are required."}), 400
+            return error_response("missing_auth")
         if len(password) < 6:
-            return jsonify({"error": "Password must be at least 6 characters."}), 400
+            return error_response("short_password")
+
+        # Known-taken names skip sqlite and the password hash entirely
+        with _taken_usernames_lock:
+            if username in _taken_usernames:
+                return error_response("username_exists")
 
         conn = get_connection()
         cur = conn.cursor()
+        # Cheap index probe first so duplicates never pay for hash_password()
         existing = cur.execute(
             "SELECT id FROM users WHERE username = ?", (username,)
         ).fetchone()
-        if existing:
-            conn.close()
-            return jsonify({"error": "Username already exists."}), 400
-
-        cur.execute(
-            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (username, generate_password_hash(password)),
-        )
+        if not existing:
+            # Atomic insert; the UNIQUE(username) constraint decides concurrent races
+            cur.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?) ON CONFLICT(username) DO NOTHING",
+                (username, hash_password(password)),
+            )
+        if existing or cur.rowcount == 0:
+            conn.rollback()
+            with _taken_usernames_lock:
+                _taken_usernames[username] = True
+            return error_response("username_exists")
         conn.commit()
+        # Only remember the name once the row is actually stored
+        with _taken_usernames_lock:
+            _taken_usernames[username] = True
         user_id = cur.lastrowid
-        conn.close()
         token = create_access_token(identity=str(user_id))
         return jsonify({"access_token": token, "username": username, "user_id": user_id}), 201
 
     # login route
     @app.route("/auth/login", methods=["POST"])
+    @limiter.limit(AUTH_RATE_LIMIT)
     def login():
         data = request.get_json(force=True)
         username = (data.get("username") or "").strip().lower()
         password = data.get("password")
         if not username or not password:
-            return jsonify({"error": "Username and password are required."}), 400
+            return error_response("missing_auth")
 
         conn = get_connection()
         user = conn.execute(
             "SELECT id, password_hash FROM users WHERE username = ?", (username,)
         ).fetchone()
-        conn.close()
-        if not user or not check_password_hash(user["password_hash"], password):
-            return jsonify({"error": "Invalid credentials."}), 401
+        # Always pay for one hash check so unknown usernames aren't distinguishable by timing
+        stored_hash = user["password_hash"] if user else _DUMMY_HASH
+        password_ok = verify_password(stored_hash, password)
+        if not user or not password_ok:
+            return error_response("invalid_credentials")
+        if needs_rehash(user["password_hash"]):
+            # Migrate legacy/outdated hashes now that we have the plaintext
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (hash_password(password), user["id"]),
+            )
+            conn.commit()
         token = create_access_token(identity=str(user["id"]))
-        print(f"✅ Login successful for user: {username} (id: {user['id']})")
-        print(f"🎫 Token generated: {token[:50]}...")
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug("✅ Login successful for user: %s (id: %s)", username, user["id"])
+            app.logger.debug("🎫 Token generated: %s...", token[:50])
         return jsonify({"access_token": token, "username": username, "user_id": user["id"]})
 
     # trip routes:
 
-    # add trip route
-    @app.route("/trips", methods=["POST"])
-    @jwt_required()
-    def add_trip():
-        user_id = get_jwt_identity()
-        data = request.get_json(force=True)
+    def validate_trip(data):
+        """Return (insert values without user_id, None) or (None, error response)."""
         required = ["destination", "start_date", "end_date", "budget", "rating"]
         missing = [k for k in required if k not in data or data[k] in [None, ""]]
         if missing:
-            return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
+            return None, (jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400)
+
+        destination = data["destination"]
+        if not isinstance(destination, str) or not destination.strip():
+            return None, error_response("invalid_destination")
 
         try:
-            start_date = datetime.fromisoformat(data["start_date"]).date()
-            end_date = datetime.fromisoformat(data["end_date"]).date()
+            start_date = _parse_date(data["start_date"])
+            end_date = _parse_date(data["end_date"])
         except (TypeError, ValueError):
-            return jsonify({"error": "Invalid date format. Use ISO format YYYY-MM-DD."}), 400
+            return None, error_response("invalid_date")
 
         if end_date < start_date:
-            return jsonify({"error": "End date cannot be before start date."}), 400
+            return None, error_response("end_before_start")
 
         try:
             budget = float(data["budget"])
             rating = float(data["rating"])
         except (TypeError, ValueError):
-            return jsonify({"error": "Budget and rating must be numbers."}), 400
+            return None, error_response("not_numbers")
+        # float() accepts "nan"/"inf"; those would only fail later on the CHECK constraint
+        if not (math.isfinite(budget) and math.isfinite(rating)):
+            return None, error_response("not_numbers")
 
+        if budget < 0:
+            return None, error_response("negative_budget")
         if rating < 0 or rating > 5:
-            return jsonify({"error": "Rating must be between 0 and 5."}), 400
+            return None, error_response("rating_range")
+
+        values = (
+            destination.strip(),
+            # already validated as canonical YYYY-MM-DD, store as sent
+            data["start_date"],
+            data["end_date"],
+            budget,
+            rating,
+        )
+        return values, None
+
+    # add trip route
+    @app.route("/trips", methods=["POST"])
+    @jwt_required()
+    def add_trip():
+        user_id = int(get_jwt_identity())
+        data = request.get_json(force=True)
+        values, error = validate_trip(data)
+        if error:
+            return error
 
         conn = get_connection()
         try:
-            print(f"🔍 DEBUG: Adding trip for user_id: {user_id}")
-            print(f"🔍 DEBUG: Database path: {DB_PATH}")
-            print(f"🔍 DEBUG: Trip data: {data}")
-            
+            app.logger.debug("🔍 Adding trip for user_id: %s (db: %s)", user_id, DB_PATH)
+            app.logger.debug("🔍 Trip data: %s", data)
+
             cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO trips (destination, start_date, end_date, budget, rating, user_id)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    data["destination"].strip(),
-                    start_date.isoformat(),
-                    end_date.isoformat(),
-                    budget,
-                    rating,
-                    user_id,
-                ),
-            )
+            cur.execute(INSERT_TRIP_SQL, (*values, user_id))
+            trips_changed(conn, user_id)
             conn.commit()
             trip_id = cur.lastrowid
-            print(f"✅ DEBUG: Trip saved with ID: {trip_id}")
-            
-            # Verify the trip was actually saved
-            verify_cur = conn.cursor()
-            verify_cur.execute("SELECT COUNT(*) as count FROM trips WHERE user_id = ?", (user_id,))
-            count = verify_cur.fetchone()["count"]
-            print(f"🔍 DEBUG: Total trips for user {user_id}: {count}")
-            
+            app.logger.debug("✅ Trip saved with ID: %s", trip_id)
             return jsonify({"id": trip_id}), 201
         except Exception as e:
-            print(f"❌ DEBUG: Database error: {str(e)}")
+            app.logger.exception("❌ Database error while adding trip")
+            conn.rollback()
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    # bulk add trips route: all-or-nothing, one transaction / one fsync for the batch
+    @app.route("/trips/bulk", methods=["POST"])
+    @jwt_required()
+    def add_trips_bulk():
+        user_id = int(get_jwt_identity())
+        data = request.get_json(force=True)
+        trips = data.get("trips") if isinstance(data, dict) else None
+        if not isinstance(trips, list) or not trips:
+            return jsonify({"error": "Request body must contain a non-empty 'trips' list."}), 400
+
+        rows = []
+        for trip in trips:
+            if not isinstance(trip, dict):
+                return jsonify({"error": "Each trip must be an object."}), 400
+            values, error = validate_trip(trip)
+            if error:
+                return error
+            rows.append((*values, user_id))
+
+        conn = get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT_TRIP_SQL, rows)
+            trips_changed(conn, user_id)
+            conn.commit()
+            return jsonify({"inserted": len(rows)}), 201
+        except Exception as e:
             conn.rollback()
             return jsonify({"error": f"Database error: {str(e)}"}), 500
-        finally:
-            conn.close()
 
     # list trips route
     @app.route("/trips", methods=["GET"])
@@ -237,99 +500,58 @@ def create_app():
     def list_trips():
         try:
             user_id = int(get_jwt_identity())
-            print(f"🔍 DEBUG: Listing trips for user_id: {user_id}")
+            app.logger.debug("🔍 Listing trips for user_id: %s", user_id)
         except Exception as e:
-            print(f"❌ JWT validation failed: {str(e)}")
+            app.logger.debug("❌ JWT validation failed: %s", e)
             raise
-        conn = get_connection()
-        rows = conn.execute(
-            """
-            SELECT id, destination, start_date, end_date, budget, rating
-            FROM trips WHERE user_id = ?
-            ORDER BY destination ASC
-            """,
-            (user_id,),
-        ).fetchall()
-        conn.close()
-        trips = [dict(row) for row in rows]
-        print(f"🔍 DEBUG: Found {len(trips)} trips for user {user_id}")
-        return jsonify(trips)
+
+        def build(conn):
+            # Plain tuples + zip with fixed keys skips the sqlite3.Row -> dict coercion
+            cur = conn.cursor()
+            cur.row_factory = None
+            rows = cur.execute(
+                """
+                SELECT id, destination, start_date, end_date, budget, rating
+                FROM trips WHERE user_id = ?
+                ORDER BY destination ASC
+                """,
+                (user_id,),
+            ).fetchall()
+            trips = [dict(zip(TRIP_FIELDS, row)) for row in rows]
+            app.logger.debug("🔍 Found %d trips for user %s", len(trips), user_id)
+            return trips
+
+        return cached_json(user_id, "trips", build)
 
     # trip detail route
     @app.route("/trips/<int:trip_id>", methods=["GET"])
     @jwt_required()
     def trip_detail(trip_id: int):
         user_id = int(get_jwt_identity())
-        conn = get_connection()
-        row = conn.execute(
-            """
-            SELECT id, destination, start_date, end_date, budget, rating
-            FROM trips WHERE id = ? AND user_id = ?
-            """,
-            (trip_id, user_id),
-        ).fetchone()
-        conn.close()
+        cur = get_connection().cursor()
+        cur.row_factory = None
+        row = cur.execute(SELECT_TRIP_SQL, (trip_id, user_id)).fetchone()
         if not row:
-            return jsonify({"error": "Trip not found"}), 404
-        return jsonify(dict(row))
+            return error_response("trip_not_found")
+        return jsonify(dict(zip(TRIP_FIELDS, row)))
 
     # update trip route
     @app.route("/trips/<int:trip_id>", methods=["PUT"])
     @jwt_required()
     def update_trip(trip_id: int):
         user_id = int(get_jwt_identity())
-        data = request.get_json()
-        
-        # Validate required fields
-        required = ["destination", "start_date", "end_date", "budget", "rating"]
-        for field in required:
-            if field not in data:
-                return jsonify({"error": f"Missing field: {field}"}), 400
-        
-        try:
-            # Validate data types
-            budget = float(data["budget"])
-            rating = float(data["rating"])
-            
-            if budget < 0:
-                return jsonify({"error": "Budget must be non-negative"}), 400
-            if not (0 <= rating <= 5):
-                return jsonify({"error": "Rating must be between 0 and 5"}), 400
-                
-            # Validate dates
-            start_date = datetime.strptime(data["start_date"], "%Y-%m-%d").date()
-            end_date = datetime.strptime(data["end_date"], "%Y-%m-%d").date()
-            
-            if start_date > end_date:
-                return jsonify({"error": "Start date must be before end date"}), 400
-                
-        except ValueError as e:
-            return jsonify({"error": f"Invalid data format: {str(e)}"}), 400
-        
+        data = request.get_json(force=True)
+        values, error = validate_trip(data)
+        if error:
+            return error
+
         conn = get_connection()
-        
-        # Check if trip exists and belongs to user
-        existing = conn.execute(
-            "SELECT id FROM trips WHERE id = ? AND user_id = ?",
-            (trip_id, user_id)
-        ).fetchone()
-        
-        if not existing:
-            conn.close()
-            return jsonify({"error": "Trip not found"}), 404
-        
-        # Update the trip
-        conn.execute(
-            """
-            UPDATE trips 
-            SET destination = ?, start_date = ?, end_date = ?, budget = ?, rating = ?
-            WHERE id = ? AND user_id = ?
-            """,
-            (data["destination"], start_date, end_date, budget, rating, trip_id, user_id)
-        )
+        if conn.execute(UPDATE_TRIP_SQL, (*values, trip_id, user_id)).rowcount == 0:
+            conn.rollback()
+            return error_response("trip_not_found")
+        trips_changed(conn, user_id)
         conn.commit()
-        conn.close()
-        
+
         return jsonify({"message": "Trip updated successfully"}), 200
 
     # delete trip route
@@ -338,22 +560,12 @@ def create_app():
     def delete_trip(trip_id: int):
         user_id = int(get_jwt_identity())
         conn = get_connection()
-        
-        # Check if trip exists and belongs to user
-        existing = conn.execute(
-            "SELECT id FROM trips WHERE id = ? AND user_id = ?",
-            (trip_id, user_id)
-        ).fetchone()
-        
-        if not existing:
-            conn.close()
-            return jsonify({"error": "Trip not found"}), 404
-        
-        # Delete the trip
-        conn.execute("DELETE FROM trips WHERE id = ? AND user_id = ?", (trip_id, user_id))
+        if conn.execute(DELETE_TRIP_SQL, (trip_id, user_id)).rowcount == 0:
+            conn.rollback()
+            return error_response("trip_not_found")
+        trips_changed(conn, user_id)
         conn.commit()
-        conn.close()
-        
+
         return jsonify({"message": "Trip deleted successfully"}), 200
 
 # module 2 backend: stats routes
@@ -363,38 +575,52 @@ def create_app():
     @jwt_required()
     def trip_stats():
         user_id = int(get_jwt_identity())
-        conn = get_connection()
-        rows = conn.execute(
-            "SELECT destination, start_date FROM trips WHERE user_id = ?", (user_id,)
-        ).fetchall()
-        conn.close()
-        if not rows:
-            return jsonify({"trips_by_month": {}, "favorite_destinations": []})
 
-        by_month = Counter()
-        dest_counter = Counter()
-        for row in rows:
-            month_key = row["start_date"][:7]
-            by_month[month_key] += 1
-            dest_counter[row["destination"]] += 1
+        def build(conn):
+            # Let sqlite do the grouping instead of pulling every row into Python
+            month_rows = conn.execute(
+                """
+                SELECT substr(start_date, 1, 7) AS month, COUNT(*) AS count
+                FROM trips WHERE user_id = ?
+                GROUP BY month
+                """,
+                (user_id,),
+            ).fetchall()
+            dest_rows = conn.execute(
+                """
+                SELECT destination, COUNT(*) AS count
+                FROM trips WHERE user_id = ?
+                GROUP BY destination
+                ORDER BY count DESC, MIN(id) ASC
+                LIMIT 5
+                """,
+                (user_id,),
+            ).fetchall()
+
+            by_month = {row["month"]: row["count"] for row in month_rows}
+            favorite = [{"destination": row["destination"], "count": row["count"]} for row in dest_rows]
+            return {"trips_by_month": by_month, "favorite_destinations": favorite}
 
-        favorite = [{"destination": d, "count": c} for d, c in dest_counter.most_common(5)]
-        return jsonify({"trips_by_month": by_month, "favorite_destinations": favorite})
+        return cached_json(user_id, "stats", build)
 
     # spending stats route
     @app.route("/trips/spending", methods=["GET"])
     @jwt_required()
     def spending():
         user_id = int(get_jwt_identity())
-        conn = get_connection()
-        rows = conn.execute("SELECT budget FROM trips WHERE user_id = ?", (user_id,)).fetchall()
-        conn.close()
-        budgets = [row["budget"] for row in rows]
-        if not budgets:
-            return jsonify({"total": 0, "average": 0})
-        total = sum(budgets)
-        avg = total / len(budgets)
-        return jsonify({"total": total, "average": avg})
+
+        def build(conn):
+            # One aggregate row; COALESCE keeps the empty case at 0 / 0
+            row = conn.execute(
+                """
+                SELECT COALESCE(SUM(budget), 0) AS total, COALESCE(AVG(budget), 0) AS average
+                FROM trips WHERE user_id = ?
+                """,
+                (user_id,),
+            ).fetchone()
+            return {"total": row["total"], "average": row["average"]}
+
+        return cached_json(user_id, "spending", build)
 
 # module 3 backend: recommendation routes
 
@@ -407,8 +633,8 @@ def create_app():
         user_id = int(get_jwt_identity())
         conn = get_connection()
         
-        # Get user's trips
-        user_trips_rows = conn.execute(
+        # Get user's trips - sqlite3.Row already supports trip["rating"], no per-row dict copies
+        user_trips = conn.execute(
             """
             SELECT destination, budget, rating
             FROM trips WHERE user_id = ?
@@ -416,53 +642,129 @@ def create_app():
             """,
             (user_id,),
         ).fetchall()
-        user_trips = [dict(row) for row in user_trips_rows]
         
         if len(user_trips) < 3:
-            # Not enough data for ML, return popular destinations
-            dest_rows = conn.execute(
-                "SELECT name as destination, avg_budget as budget, avg_rating as rating, description FROM destinations ORDER BY popularity DESC LIMIT 3"
-            ).fetchall()
-            destinations = [dict(row) for row in dest_rows]
-            for dest in destinations:
-                dest["reason"] = "Popular destination - add more trips for AI-powered recommendations"
-                dest["is_new"] = True
-            conn.close()
-            return jsonify({"recommendations": destinations, "message": "Add more trips to get AI-powered recommendations."})
-        
-        # Get all destinations from database
-        dest_rows = conn.execute(
-            "SELECT name as destination, country, avg_budget as budget, avg_rating as rating, description FROM destinations"
-        ).fetchall()
-        all_destinations = [dict(row) for row in dest_rows]
-        conn.close()
+            # Not enough data for ML, return popular destinations (same for every user)
+            return jsonify({"recommendations": _destination_table().popular, "message": POPULAR_MESSAGE})
         
-        # Get visited destinations
-        visited_destinations = {trip["destination"].lower() for trip in user_trips}
+        # Mask out visited destinations on the in-memory columns - no per-row dicts
+        table = _destination_table()
+        visited = [trip["destination"].lower() for trip in user_trips]
+        unvisited = np.flatnonzero(np.isin(table.lower_names, visited, invert=True))
         
-        # Filter unvisited destinations only
-        unvisited_destinations = [
-            dest for dest in all_destinations 
-            if dest["destination"].lower() not in visited_destinations
-        ]
-        
-        if not unvisited_destinations:
+        if not len(unvisited):
             return jsonify({"recommendations": [], "message": "You've visited all destinations in our database!"})
         
         
 
         # Advanced ML-based recommendations
         
-        recommendations = _get_ml_recommendations(user_trips, unvisited_destinations)
+        recommendations = _get_ml_recommendations(user_trips, table, unvisited)
         return jsonify({"recommendations": recommendations, "message": "AI-powered recommendations using KNN and NLP"})
         
     return app
 
 # Advanced ML-based recommendation functions
 
-def _get_ml_recommendations(user_trips: List[Dict], candidates: List[Dict]) -> List[Dict]:
+class DestinationTable:
+    """Column-oriented (NumPy) snapshot of the destinations table, used by /recommend."""
+
+    def __init__(self, rows):
+        self.names = [row["name"] for row in rows]
+        self.countries = [row["country"] for row in rows]
+        self.descriptions = [row["description"] for row in rows]
+        self.lower_names = np.array([name.lower() for name in self.names], dtype=object)
+        self.budgets = np.array([row["avg_budget"] for row in rows], dtype=np.float64)
+        self.log_budgets = np.log1p(self.budgets)
+        self.ratings = np.array([row["avg_rating"] for row in rows], dtype=np.float64)
+        self.popularity = np.array([row["popularity"] for row in rows], dtype=np.int64)
+        self.loaded_at = time.monotonic()
+
+        # Cold-start answer, built once per load; treated as read-only by callers
+        self.popular = [
+            {
+                "destination": self.names[idx],
+                "budget": float(self.budgets[idx]),
+                "rating": float(self.ratings[idx]),
+                "description": self.descriptions[idx],
+                "reason": POPULAR_REASON,
+                "is_new": True,
+            }
+            for idx in np.argsort(-self.popularity, kind="stable")[:3]
+        ]
+
+    @classmethod
+    def load(cls):
+        rows = get_connection().execute(
+            "SELECT name, country, avg_budget, avg_rating, popularity, description FROM destinations ORDER BY id"
+        ).fetchall()
+        return cls(rows)
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        return {
+            "destination": self.names[idx],
+            "country": self.countries[idx],
+            "budget": float(self.budgets[idx]),
+            "rating": float(self.ratings[idx]),
+            "description": self.descriptions[idx],
+        }
+
+
+# destinations is small and effectively static: load once, refresh after a TTL
+DESTINATION_TABLE_TTL = 600
+_dest_table = None
+_dest_table_lock = threading.Lock()
+
+
+def _destination_table() -> DestinationTable:
+    global _dest_table
+    table = _dest_table
+    if table is None or time.monotonic() - table.loaded_at > DESTINATION_TABLE_TTL:
+        with _dest_table_lock:
+            if _dest_table is table:
+                _dest_table = DestinationTable.load()
+            table = _dest_table
+    return table
+
+
+def _knn_topk_numpy(log_budgets: np.ndarray, ratings: np.ndarray, tb: float, tr: float, k: int) -> np.ndarray:
+    # Squared euclidean distance to the target ranks the same as euclidean
+    d2 = (log_budgets - tb) ** 2 + (ratings - tr) ** 2
+    
+    # Stable sort keeps the lowest index among equal distances, same as the numba kernel.
+    # argpartition would pick an arbitrary subset of ties at the k boundary; N is ~130.
+    return np.argsort(d2, kind="stable")[:k]
+
+
+if njit is not None:
+    # One fused pass over the columns keeping a sorted top-k buffer, with no
+    # temporaries. Compiled eagerly (at import, so before gunicorn forks) and
+    # cached on disk. No fastmath: contracting d2 into an FMA would round differently
+    # from the NumPy fallback and reorder exact ties between the two paths.
+    @njit("int64[:](float64[:], float64[:], float64, float64, int64)", cache=True)
+    def _knn_topk(log_budgets, ratings, tb, tr, k):
+        best_d = np.full(k, np.inf)
+        best_i = np.full(k, -1, dtype=np.int64)
+        for i in range(log_budgets.shape[0]):
+            db = log_budgets[i] - tb
+            dr = ratings[i] - tr
+            d2 = db * db + dr * dr
+            if d2 < best_d[k - 1]:
+                j = k - 1
+                while j > 0 and best_d[j - 1] > d2:
+                    best_d[j] = best_d[j - 1]
+                    best_i[j] = best_i[j - 1]
+                    j -= 1
+                best_d[j] = d2
+                best_i[j] = i
+        return best_i
+else:
+    _knn_topk = _knn_topk_numpy
+
+
+def _get_ml_recommendations(user_trips: List[Dict], table: "DestinationTable", candidates: np.ndarray) -> List[Dict]:
     """
-    Simplified ML recommendation using scikit-learn KNN with basic NLP
+    Simplified ML recommendation: KNN over NumPy feature columns with basic NLP
     Logic: Find destinations similar to user's top-rated trip based on budget, rating, and simple text features
     """
     
@@ -472,46 +774,35 @@ def _get_ml_recommendations(user_trips: List[Dict], candidates: List[Dict]) -> L
     # Use user's top-rated trip as the target 
     top_trip = max(user_trips, key=lambda x: x["rating"])
     
-    # Extract features for each candidate destination
-    features = []
-    for dest in candidates:
-        # Numerical features (similar to original but log-scaled)
-        budget_scaled = math.log1p(dest["budget"])  # Log scale for budget
-        rating_scaled = dest["rating"]
-        
-        # Combine all features: [budget, rating, text_features...]
-        feature_vector = [budget_scaled, rating_scaled] 
-        features.append(feature_vector)
-    
-    # Create target vector from user's top trip
-    target_vector = [
-        math.log1p(top_trip["budget"]), 
-        top_trip["rating"]
-    ] 
+    # Feature columns of the candidate rows: [log-scaled budget, rating]
+    budgets = table.log_budgets[candidates]
+    ratings = table.ratings[candidates]
     
-    # Use scikit-learn KNN (euclidean distance like original)
-    features_array = np.array(features)
-    target_array = np.array(target_vector).reshape(1, -1)
-    
-    knn = NearestNeighbors(n_neighbors=min(k, len(candidates)), metric='euclidean')
-    knn.fit(features_array)
-    distances, indices = knn.kneighbors(target_array)
+    nearest = _knn_topk(budgets, ratings, math.log1p(top_trip["budget"]), float(top_trip["rating"]), min(k, len(candidates)))
     
     # Build recommendations with simple explanations
+    # Everything that depends only on the top trip is computed once, not per recommendation
+    top_budget = top_trip["budget"]
+    top_rating = top_trip["rating"]
+    top_name = top_trip["destination"]
+    similar_budget = top_budget * 0.3
+    close_budget = top_budget * 0.5
+    alternative_reason = f"Alternative destination - different style from your {top_name} trip"
+
     recommendations = []
-    for distance, idx in zip(distances[0], indices[0]):
-        dest = candidates[idx].copy()
+    for idx in candidates[nearest]:
+        dest = table.row(idx)
         
         # Simple reason generation (like original algorithm)
-        budget_diff = abs(dest["budget"] - top_trip["budget"])
-        rating_diff = abs(dest["rating"] - top_trip["rating"])
+        budget_diff = abs(dest["budget"] - top_budget)
+        rating_diff = abs(dest["rating"] - top_rating)
         
-        if budget_diff < top_trip["budget"] * 0.3 and rating_diff < 0.5:
-            reason = f"Similar budget (${dest['budget']:.0f}) and rating ({dest['rating']}) to your {top_trip['destination']} trip"
-        elif budget_diff < top_trip["budget"] * 0.5:
-            reason = f"Good budget match (${dest['budget']:.0f}) compared to your {top_trip['destination']} trip"
+        if budget_diff < similar_budget and rating_diff < 0.5:
+            reason = f"Similar budget (${dest['budget']:.0f}) and rating ({dest['rating']}) to your {top_name} trip"
+        elif budget_diff < close_budget:
+            reason = f"Good budget match (${dest['budget']:.0f}) compared to your {top_name} trip"
         else:
-            reason = f"Alternative destination - different style from your {top_trip['destination']} trip"
+            reason = alternative_reason
         
         dest["reason"] = reason
         dest["is_new"] = True
@@ -522,6 +813,10 @@ def _get_ml_recommendations(user_trips: List[Dict], candidates: List[Dict]) -> L
 # Running the app
 
 if __name__ == "__main__":
+    # Development server only - production runs under gunicorn (see gunicorn.conf.py)
+    if os.environ.get("FLASK_ENV") == "production":
+        raise SystemExit("Refusing to start the dev server in production; run: gunicorn -c gunicorn.conf.py wsgi:app")
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s in %(module)s: %(message)s")
     app = create_app()
     print("=" * 60)
     print("🚀 TripLogger Backend Server Starting...")
@@ -534,5 +829,3 @@ if __name__ == "__main__":
     debug=True,
     use_reloader=False
 )
-
-
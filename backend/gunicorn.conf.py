@@ -0,0 +1,19 @@
+import multiprocessing
+import os
+
+# Threaded workers so blocking sqlite/password-hash work overlaps across requests.
+# gevent buys nothing here: sqlite3 and hashlib.scrypt are blocking C calls that would
+# stall the event loop, so it is only an opt-in via GUNICORN_WORKER_CLASS.
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Run create_app() (init_db + JWT setup) once in the master, then fork
+preload_app = True
+
+
+def worker_exit(server, worker):
+    from db import close_all_connections
+
+    close_all_connections()
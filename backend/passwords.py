@@ -0,0 +1,60 @@
+import base64
+import hashlib
+import hmac
+import os
+
+from werkzeug.security import check_password_hash
+
+# scrypt straight from hashlib (OpenSSL), stored as $scrypt$n=..,r=..,p=..$<b64 salt>$<b64 hash>
+# SCRYPT_N is the cost knob: run `python passwords.py` on the target box and pick the
+# largest value under the login latency budget. Hashes with other params are upgraded on login.
+SCRYPT_N = int(os.environ.get("SCRYPT_N", 2 ** 14))
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+SCRYPT_SALT_BYTES = 16
+_SCRYPT_PARAMS = f"n={SCRYPT_N},r={SCRYPT_R},p={SCRYPT_P}"
+_SCRYPT_PREFIX = f"$scrypt${_SCRYPT_PARAMS}$"
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=2 * 128 * r * n, dklen=SCRYPT_DKLEN
+    )
+
+
+def hash_password(password: str) -> str:
+    salt = os.urandom(SCRYPT_SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return _SCRYPT_PREFIX + base64.b64encode(salt).decode() + "$" + base64.b64encode(digest).decode()
+
+
+def _verify_scrypt(stored_hash: str, password: str) -> bool:
+    try:
+        _, _, params, salt, digest = stored_hash.split("$")
+        cost = dict(item.split("=") for item in params.split(","))
+        expected = base64.b64decode(digest)
+        actual = _scrypt(password, base64.b64decode(salt), int(cost["n"]), int(cost["r"]), int(cost["p"]))
+    except (ValueError, KeyError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def verify_password(stored_hash: str, password: str) -> bool:
+    if stored_hash.startswith("$scrypt$"):
+        return _verify_scrypt(stored_hash, password)
+    # Legacy werkzeug hash (pbkdf2/scrypt)
+    return check_password_hash(stored_hash, password)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    return not stored_hash.startswith(_SCRYPT_PREFIX)
+
+
+if __name__ == "__main__":
+    import time
+
+    for n in (2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16):
+        start = time.perf_counter()
+        _scrypt("calibration", os.urandom(SCRYPT_SALT_BYTES), n, SCRYPT_R, SCRYPT_P)
+        print(f"n={n:>6}: {(time.perf_counter() - start) * 1000:.1f} ms")
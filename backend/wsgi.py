@@ -0,0 +1,9 @@
+# WSGI entrypoint for gunicorn: gunicorn -c gunicorn.conf.py wsgi:app
+import logging
+
+from app import create_app
+
+# Same format as Flask's default handler; lets module loggers (db seed, etc.) through at INFO
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s in %(module)s: %(message)s")
+
+app = create_app()